@@ -1,59 +1,92 @@
-import json
+"""Legacy interactive CLI for Pilk DN Log, backed by PositionManager."""
+
+import math
 import os
+import re
 import sys
-from datetime import datetime
+from pathlib import Path
 
-# --- CONFIGURATION ---
-DATA_FILE = "sniper_trade.json"
-HISTORY_FILE = "trade_history.json"
+try:
+    from pilk_dn_log.positions import (
+        HISTORY_FILE, Position, PositionManager, now_iso, read_json
+    )
+except ImportError:  # running from a source checkout without installing
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+    from pilk_dn_log.positions import (
+        HISTORY_FILE, Position, PositionManager, now_iso, read_json
+    )
 
-def load_positions():
-    """Load all positions from data file."""
-    if not os.path.exists(DATA_FILE):
-        return []
-    try:
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+# --- CONFIGURATION ---
+LEGACY_DATA_FILE = Path("sniper_trade.json")  # pre-PositionManager storage, imported once
+LEGACY_HISTORY_FILE = Path("trade_history.json")  # the old CLI's closed trades
 
-def save_positions(positions):
-    """Save all positions to data file."""
-    with open(DATA_FILE, 'w') as f:
-        json.dump(positions, f, indent=4)
+# Plain decimal number, optionally signed / in exponent form
+FLOAT_RE = re.compile(r'\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$')
 
-def get_position_by_id(pos_id):
-    """Find a position by its ID."""
-    positions = load_positions()
-    for pos in positions:
-        if pos['id'] == pos_id:
-            return pos
-    return None
+def legacy_position(old, closed=False):
+    """Convert a record from the old sniper_trade.json / trade_history.json."""
+    # Old names look like BTC-27FEB-70000-C
+    parts = old['name'].split('-')
+    expiry = parts[1] if len(parts) > 1 else ''
+    delta = old.get('last_delta', 0.0)
+    return Position(
+        id=f"legacy-{old['id']}",
+        name=old['name'],
+        option_type=old['type'],
+        strike=old['strike'],
+        expiry=expiry,
+        size=old['size'],
+        entry_delta=delta,
+        band=old['band'],
+        current_hedge=old['current_hedge_pos'],
+        created_at=old.get('start_time', now_iso()),
+        # Closed trades keep their close time as the last update
+        updated_at=(closed and old.get('end_time')) or now_iso(),
+        rehedge_count=old.get('trades_count', 0),
+        is_active=not closed,
+        binance_symbol=PositionManager.make_binance_symbol(
+            expiry, old['strike'], old['type']),
+        last_delta=delta,
+    )
 
-def remove_position(pos_id):
-    """Remove a position by ID."""
-    positions = load_positions()
-    positions = [p for p in positions if p['id'] != pos_id]
-    save_positions(positions)
+def import_legacy_positions(manager):
+    """Move positions from the old sniper_trade.json into PositionManager."""
+    if not LEGACY_DATA_FILE.exists():
+        return
+    legacy = read_json(LEGACY_DATA_FILE, None)
+    if not isinstance(legacy, list):
+        print(f"❌ Could not read {LEGACY_DATA_FILE}, not importing it.")
+        return
+    for old in legacy:
+        manager.add_position(legacy_position(old), save=False)
+    manager.flush()
+    LEGACY_DATA_FILE.rename(LEGACY_DATA_FILE.with_name(LEGACY_DATA_FILE.name + ".imported"))
+    print(f"📥 Imported {len(legacy)} position(s) from {LEGACY_DATA_FILE}")
 
-def generate_id():
-    """Generate a unique ID for a new position."""
-    positions = load_positions()
-    if not positions:
-        return 1
-    return max(p['id'] for p in positions) + 1
+def import_legacy_history(manager):
+    """Append closed trades from the old trade_history.json to the shared history."""
+    if not LEGACY_HISTORY_FILE.exists():
+        return
+    trades = read_json(LEGACY_HISTORY_FILE, None)
+    if not isinstance(trades, list):
+        print(f"❌ Could not read {LEGACY_HISTORY_FILE}, not importing it.")
+        return
+    manager.append_history(legacy_position(old, closed=True) for old in trades)
+    LEGACY_HISTORY_FILE.rename(LEGACY_HISTORY_FILE.with_name(LEGACY_HISTORY_FILE.name + ".imported"))
+    print(f"📥 Imported {len(trades)} closed trade(s) from {LEGACY_HISTORY_FILE}")
 
 def get_float(prompt):
     """Get a float input from user with validation."""
     while True:
-        try:
-            return float(input(prompt))
-        except ValueError:
-            print("❌ Invalid number. Try again.")
+        raw = input(prompt)
+        # The pattern still lets through overflowing exponents like 1e400 (-> inf)
+        if FLOAT_RE.match(raw) and math.isfinite(value := float(raw)):
+            return value
+        print("❌ Invalid number. Try again.")
 
-def list_positions():
+def list_positions(manager):
     """List all active positions."""
-    positions = load_positions()
+    positions = manager.load_positions()
     
     if not positions:
         print("\n🚫 NO ACTIVE POSITIONS")
@@ -63,17 +96,29 @@ def list_positions():
     print("📋 ACTIVE POSITIONS")
     print("="*50)
     
-    for pos in positions:
-        last_delta = pos.get('last_delta', 'N/A')
-        print(f"  [{pos['id']}] {pos['name']}")
-        print(f"      Type: {pos['type'].upper()} | Size: {pos['size']} | Band: {pos['band']}")
-        print(f"      Last Delta: {last_delta} | Hedges: {pos['trades_count']}")
-        print(f"      Hedge Position: {pos['current_hedge_pos']:.5f} BTC")
+    for num, pos in enumerate(positions, 1):
+        last_delta = pos.last_delta if pos.last_delta is not None else 'N/A'
+        print(f"  [{num}] {pos.name}")
+        print(f"      Type: {pos.option_type.upper()} | Size: {pos.size} | Band: {pos.band}")
+        print(f"      Last Delta: {last_delta} | Hedges: {pos.rehedge_count}")
+        print(f"      Hedge Position: {pos.current_hedge:.5f} BTC")
         print("-" * 50)
     
     return positions
 
-def new_trade():
+def select_position(positions, verb):
+    """Ask for a position number from the last listing."""
+    try:
+        num = int(input(f"\nEnter position number to {verb}: "))
+    except ValueError:
+        print("❌ Invalid number.")
+        return None
+    if not 1 <= num <= len(positions):
+        print("❌ Position not found.")
+        return None
+    return positions[num - 1]
+
+def new_trade(manager):
     """Create a new trade position."""
     print("\n" + "="*40)
     print("🆕  INITIALIZE NEW TRADE")
@@ -93,27 +138,30 @@ def new_trade():
     entry_delta = get_float("Δ  Entry Delta (0.0 to 1.0): ")
     size = get_float("📦 Size (Contracts, e.g. 0.1): ")
 
-    # Auto-generate name
-    contract_name = f"BTC-{expiry}-{int(strike)}"
-    if option_type == 'call':
-        contract_name += "-C"
-    else:
-        contract_name += "-P"
-
     # 2. CALCULATE STARTING HEDGE
-    raw_delta_exposure = size * entry_delta
-    
-    if option_type == 'call':
-        required_hedge = -raw_delta_exposure
-        hedge_desc = "SHORT"
-    else:
-        required_hedge = raw_delta_exposure
-        hedge_desc = "LONG"
+    now = now_iso()
+    position = Position(
+        id=manager.generate_id(),
+        name=PositionManager.make_contract_name(expiry, strike, option_type),
+        option_type=option_type,
+        strike=strike,
+        expiry=expiry,
+        size=size,
+        entry_delta=entry_delta,
+        band=band,
+        current_hedge=0.0,
+        created_at=now,
+        updated_at=now,
+        binance_symbol=PositionManager.make_binance_symbol(expiry, strike, option_type),
+        last_delta=entry_delta,
+    )
+    position.current_hedge = position.target_hedge
+    hedge_desc = "SHORT" if position.current_hedge < 0 else "LONG"
 
     print("\n" + "-"*40)
     print(f"✅ CALCULATED STARTING HEDGE:")
-    print(f"   You are Long {option_type.upper()}. Exposure: {raw_delta_exposure:.4f} BTC")
-    print(f"   👉 ACTION: Open {hedge_desc} Perp Position: {abs(required_hedge):.4f} BTC")
+    print(f"   You are Long {option_type.upper()}. Exposure: {size * entry_delta:.4f} BTC")
+    print(f"   👉 ACTION: Open {hedge_desc} Perp Position: {abs(position.current_hedge):.4f} BTC")
     print("-" * 40)
     
     confirm = input("Did you execute this hedge? (y/n): ")
@@ -121,51 +169,28 @@ def new_trade():
         print("❌ Setup cancelled.")
         return None
 
-    # 3. SAVE TO FILE
-    pos_id = generate_id()
-    position = {
-        "id": pos_id,
-        "start_time": str(datetime.now()),
-        "name": contract_name,
-        "type": option_type,
-        "strike": strike,
-        "size": size,
-        "band": band,
-        "current_hedge_pos": required_hedge,
-        "trades_count": 0,
-        "last_delta": entry_delta
-    }
-    
-    positions = load_positions()
-    positions.append(position)
-    save_positions(positions)
+    # 3. SAVE
+    try:
+        manager.add_position(position)
+    except ValueError as e:  # id taken, e.g. by the TUI in the same second
+        print(f"❌ Not saved: {e}")
+        return None
     
-    print(f"\n💾 Position saved with ID: {pos_id}")
+    print(f"\n💾 Position saved with ID: {position.id}")
     return position
 
-def update_delta(pos_id):
+def update_delta(manager, position):
     """Update delta for a specific position."""
-    position = get_position_by_id(pos_id)
-    if not position:
-        print("❌ Position not found.")
-        return
-    
     print("\n" + "="*40)
-    print(f"🔎 UPDATE DELTA: {position['name']} [ID: {pos_id}]")
-    print(f"   Size: {position['size']} | Band: {position['band']} | Type: {position['type'].upper()}")
+    print(f"🔎 UPDATE DELTA: {position.name} [ID: {position.id}]")
+    print(f"   Size: {position.size} | Band: {position.band} | Type: {position.option_type.upper()}")
     print("="*40)
     
     current_delta = get_float("\nInput Current Option Delta (0.0 - 1.0): ")
     
     # CALCULATE MATH
-    if position['type'] == 'call':
-        contract_delta_val = abs(current_delta)
-        target_hedge = -(position['size'] * contract_delta_val)
-    else:
-        contract_delta_val = abs(current_delta)
-        target_hedge = (position['size'] * contract_delta_val)
-
-    current_hedge = position['current_hedge_pos']
+    target_hedge = position.calculate_target_hedge(abs(current_delta))
+    current_hedge = position.current_hedge
     diff = target_hedge - current_hedge
     
     print("\n-----------------------------------")
@@ -175,12 +200,12 @@ def update_delta(pos_id):
     print("-----------------------------------")
 
     # DECISION LOGIC
-    abs_diff = abs(diff)
+    needs_rehedge, abs_diff, action = position.check_rehedge(abs(current_delta))
     
-    if abs_diff > position['band']:
-        print(f"\n🚨 ALERT: DIFF {abs_diff:.5f} > BAND {position['band']}")
+    if needs_rehedge:
+        print(f"\n🚨 ALERT: DIFF {abs_diff:.5f} > BAND {position.band}")
         
-        if diff > 0:
+        if action == "BUY":
             action = "BUY / LONG"
             reason = "Covering Short or Adding Long"
         else:
@@ -193,90 +218,52 @@ def update_delta(pos_id):
         
         confirm = input("\nDid you do it? (y/n): ")
         if confirm.lower() == 'y':
-            # Update position
-            position['current_hedge_pos'] += diff
-            position['trades_count'] += 1
-            position['last_delta'] = current_delta
-            
-            # Update in positions list
-            positions = load_positions()
-            for i, pos in enumerate(positions):
-                if pos['id'] == pos_id:
-                    positions[i] = position
-                    break
-            save_positions(positions)
-            
+            position.current_hedge = target_hedge
+            position.rehedge_count += 1
+            position.last_delta = current_delta
+            position.updated_at = now_iso()
+            manager.update_position(position)
             print("✅ Position updated. Back to Neutral.")
     else:
         print("\n✅ STATUS: SAFE")
         print("   (Inside the Band. Do nothing.)")
         # Still update last_delta even if no rehedge
-        position['last_delta'] = current_delta
-        positions = load_positions()
-        for i, pos in enumerate(positions):
-            if pos['id'] == pos_id:
-                positions[i] = position
-                break
-        save_positions(positions)
+        position.last_delta = current_delta
+        position.updated_at = now_iso()
+        manager.update_position(position)
 
-def close_position(pos_id):
+def close_position(manager, position):
     """Close and archive a position."""
-    position = get_position_by_id(pos_id)
-    if not position:
-        print("❌ Position not found.")
-        return
-    
-    print(f"\n📦 Closing position: {position['name']}")
+    print(f"\n📦 Closing position: {position.name}")
     confirm = input("Are you sure? (y/n): ")
     if confirm.lower() != 'y':
         print("❌ Cancelled.")
         return
     
-    # Archive to history
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, 'r') as f:
-                history = json.load(f)
-        except:
-            history = []
-    
-    position['end_time'] = str(datetime.now())
-    history.append(position)
-    
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=4)
-    
-    # Remove from active positions
-    remove_position(pos_id)
+    manager.close_position(position.id)
     
     print(f"✅ Position archived to {HISTORY_FILE}")
 
-def show_history():
+def show_history(manager):
     """Show trade history."""
-    if not os.path.exists(HISTORY_FILE):
-        print("\n🚫 No trade history found.")
-        return
-    
-    with open(HISTORY_FILE, 'r') as f:
-        history = json.load(f)
-    
-    if not history:
-        print("\n🚫 Trade history is empty.")
-        return
-    
-    print("\n" + "="*50)
-    print("📚 TRADE HISTORY")
-    print("="*50)
-    
-    for trade in history:
+    empty = True
+    for trade in manager.load_history():
+        if empty:
+            print("\n" + "="*50)
+            print("📚 TRADE HISTORY")
+            print("="*50)
+            empty = False
+        
         print(f"\n  [{trade['id']}] {trade['name']}")
-        print(f"      Start: {trade['start_time']}")
-        print(f"      End: {trade.get('end_time', 'N/A')}")
-        print(f"      Type: {trade['type'].upper()} | Size: {trade['size']}")
-        print(f"      Final Hedge: {trade['current_hedge_pos']:.5f} BTC")
-        print(f"      Total Hedges: {trade['trades_count']}")
+        print(f"      Start: {trade['created_at']}")
+        print(f"      End: {trade.get('updated_at', 'N/A')}")
+        print(f"      Type: {trade['option_type'].upper()} | Size: {trade['size']}")
+        print(f"      Final Hedge: {trade['current_hedge']:.5f} BTC")
+        print(f"      Total Hedges: {trade['rehedge_count']}")
         print("-" * 50)
+    
+    if empty:
+        print("\n🚫 No trade history found.")
 
 def main_menu():
     """Display main menu options."""
@@ -292,36 +279,35 @@ def main_menu():
     print("-"*30)
 
 def main():
+    manager = PositionManager()
+    import_legacy_positions(manager)
+    import_legacy_history(manager)
     while True:
         main_menu()
         choice = input("Select: ").strip()
         
         if choice == '1':
-            list_positions()
+            list_positions(manager)
         
         elif choice == '2':
-            new_trade()
+            new_trade(manager)
         
         elif choice == '3':
-            positions = list_positions()
+            positions = list_positions(manager)
             if positions:
-                try:
-                    pos_id = int(input("\nEnter position ID to update: "))
-                    update_delta(pos_id)
-                except ValueError:
-                    print("❌ Invalid ID.")
+                position = select_position(positions, "update")
+                if position:
+                    update_delta(manager, position)
         
         elif choice == '4':
-            positions = list_positions()
+            positions = list_positions(manager)
             if positions:
-                try:
-                    pos_id = int(input("\nEnter position ID to close: "))
-                    close_position(pos_id)
-                except ValueError:
-                    print("❌ Invalid ID.")
+                position = select_position(positions, "close")
+                if position:
+                    close_position(manager, position)
         
         elif choice == '5':
-            show_history()
+            show_history(manager)
         
         elif choice == '6':
             print("\n👋 Goodbye!")
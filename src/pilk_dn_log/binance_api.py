@@ -1,23 +1,39 @@
 """Binance Options API integration via ccxt."""
 
-import ccxt
+import ccxt.async_support as ccxt_async
+import re
+import time
 from typing import Optional
 import asyncio
 
+from .positions import DATA_DIR, dumps, read_json
+
+MARKETS_CACHE_FILE = DATA_DIR / "markets_cache.json"
+MARKETS_TTL = 60  # seconds
+REQUEST_TIMEOUT_MS = 5000  # ccxt default is 10s; fail fast so stale polls don't linger
+
+# Strike and option side at the end of a symbol like BTC-240227-70000-C
+_SYM_RE = re.compile(r'(\d+)-(C|P)$')
+
 
 class BinanceOptions:
     """Fetch option data from Binance via ccxt."""
     
     def __init__(self, api_key: str = None, secret: str = None):
         # Binance options requires separate exchange instance
-        self.exchange = ccxt.binance({
+        self.exchange = ccxt_async.binance({
             'apiKey': api_key,
             'secret': secret,
             'enableRateLimit': True,
+            'timeout': REQUEST_TIMEOUT_MS,
             'options': {
                 'defaultType': 'option',  # Use options market
             }
         })
+        # base -> (fetched_at, options chain)
+        self._markets_cache: dict[str, tuple[float, dict]] = {}
+        # Contents of MARKETS_CACHE_FILE, read once (None until first needed)
+        self._disk_cache: Optional[dict] = None
     
     async def get_option_delta(self, symbol: str) -> Optional[float]:
         """
@@ -47,8 +63,32 @@ class BinanceOptions:
             print(f"Error fetching delta for {symbol}: {e}")
             return None
     
+    async def fetch_deltas(self, symbols: list[str]) -> dict[str, Optional[float]]:
+        """Fetch deltas for several symbols concurrently."""
+        deltas = await asyncio.gather(*(self.get_option_delta(s) for s in symbols))
+        return dict(zip(symbols, deltas))
+    
     async def get_options_chain(self, base: str = 'BTC') -> dict:
-        """Fetch full options chain for a base asset."""
+        """
+        Fetch full options chain for a base asset.
+        Results are cached for MARKETS_TTL seconds in memory and on disk.
+        """
+        now = time.time()
+        cached = self._markets_cache.get(base)
+        if cached and now - cached[0] < MARKETS_TTL:
+            return cached[1]
+        
+        if self._disk_cache is None:
+            # The file can be several MB: read and parse it off the event loop
+            self._disk_cache = await asyncio.to_thread(self._load_markets_cache)
+        disk = self._disk_cache.get(base)
+        if (isinstance(disk, dict) and isinstance(disk.get('markets'), dict)
+                and isinstance(disk.get('expires_at'), (int, float))
+                and disk['expires_at'] > now):
+            options = disk['markets']
+            self._markets_cache[base] = (disk['expires_at'] - MARKETS_TTL, options)
+            return options
+        
         try:
             markets = await self.exchange.load_markets()
             options = {}
@@ -57,11 +97,30 @@ class BinanceOptions:
                 if market.get('type') == 'option' and market.get('base') == base:
                     options[symbol] = market
             
-            return options
-            
         except Exception as e:
             print(f"Error fetching options chain: {e}")
             return {}
+        
+        self._markets_cache[base] = (now, options)
+        self._disk_cache[base] = {'expires_at': now + MARKETS_TTL, 'markets': options}
+        # Shallow copy: entries are replaced, never mutated, while the thread encodes
+        await asyncio.to_thread(self._save_markets_cache, dict(self._disk_cache))
+        return options
+    
+    @staticmethod
+    def _load_markets_cache() -> dict:
+        """Read the on-disk options chain cache; anything malformed counts as empty."""
+        cache = read_json(MARKETS_CACHE_FILE, {})
+        return cache if isinstance(cache, dict) else {}
+    
+    @staticmethod
+    def _save_markets_cache(cache: dict):
+        """Persist the options chains so later runs can skip load_markets."""
+        try:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            MARKETS_CACHE_FILE.write_bytes(dumps(cache, indent=False))
+        except (OSError, TypeError) as e:
+            print(f"Error saving markets cache: {e}")
     
     async def close(self):
         """Close exchange connection."""
@@ -75,8 +134,7 @@ class MockBinanceOptions:
         """Return mock delta for testing."""
         # Parse symbol to estimate delta
         # BTC-240227-70000-C -> strike 70000, call
-        import re
-        match = re.search(r'(\d+)-(C|P)$', symbol)
+        match = _SYM_RE.search(symbol)
         if match:
             strike = int(match.group(1))
             opt_type = match.group(2)
@@ -103,12 +161,36 @@ class MockBinanceOptions:
         
         return 0.50  # Default
     
+    async def fetch_deltas(self, symbols: list[str]) -> dict[str, Optional[float]]:
+        """Return mock deltas for several symbols."""
+        deltas = await asyncio.gather(*(self.get_option_delta(s) for s in symbols))
+        return dict(zip(symbols, deltas))
+    
     async def close(self):
         pass
 
 
+# Shared API instances, keyed by (api_key, secret, mock)
+_apis: dict[tuple, object] = {}
+
+
 def get_binance_api(api_key: str = None, secret: str = None, mock: bool = False):
-    """Get Binance API instance."""
-    if mock or not api_key:
-        return MockBinanceOptions()
-    return BinanceOptions(api_key, secret)
+    """
+    Get the shared Binance API instance for these credentials.
+    Reusing one ccxt exchange keeps its HTTP session (and connections) alive across calls.
+    """
+    mock = mock or not api_key
+    key = (api_key, secret, mock)
+    api = _apis.get(key)
+    if api is None:
+        api = MockBinanceOptions() if mock else BinanceOptions(api_key, secret)
+        _apis[key] = api
+    return api
+
+
+async def close_binance_apis():
+    """Close all shared API instances."""
+    apis = list(_apis.values())
+    _apis.clear()
+    for api in apis:
+        await api.close()
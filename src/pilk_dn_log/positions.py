@@ -2,17 +2,96 @@
 
 import json
 import os
+import re
 from datetime import datetime
-from dataclasses import dataclass, asdict, field
-from typing import Optional
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to stdlib json
+    orjson = None
+
 DATA_DIR = Path.home() / ".pilk"
 POSITIONS_FILE = DATA_DIR / "dn_positions.json"
-HISTORY_FILE = DATA_DIR / "dn_history.json"
+HISTORY_FILE = DATA_DIR / "dn_history.jsonl"  # one JSON record per line
+LEGACY_HISTORY_FILE = DATA_DIR / "dn_history.json"
+
+# Minimum number of positions before scan() uses the Numba kernel
+SCAN_BATCH_MIN = 64
+
+# Expiry like 27FEB -> ('27', 'FEB')
+_EXPIRY_RE = re.compile(r'(\d{1,2})(\w{3})')
+_MONTHS = {'JAN': '01', 'FEB': '02', 'MAR': '03', 'APR': '04',
+           'MAY': '05', 'JUN': '06', 'JUL': '07', 'AUG': '08',
+           'SEP': '09', 'OCT': '10', 'NOV': '11', 'DEC': '12'}
+
+
+def now_iso() -> str:
+    """Current local time as an ISO-8601 string with second precision."""
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _loads(raw: bytes):
+    """Decode JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _default(obj):
+    """Serialize objects the JSON encoders don't handle natively."""
+    if isinstance(obj, Position):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, indent: bool = True) -> bytes:
+    """Encode an object as JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_default, option=orjson.OPT_INDENT_2 if indent else None
+        )
+    return json.dumps(obj, default=_default, indent=2 if indent else None).encode()
+
+
+def read_json(path: Path, default):
+    """Read and decode a JSON file in one contiguous read.
+
+    Returns ``default`` if the file is missing or unreadable.
+    """
+    try:
+        return _loads(path.read_bytes())
+    except (OSError, ValueError):
+        return default
+
 
+def _history_lines(records: Iterable) -> bytes:
+    """Encode records as JSON Lines for HISTORY_FILE."""
+    return b''.join(dumps(r, indent=False) + b'\n' for r in records)
 
-@dataclass
+
+def _append_history(lines: bytes):
+    """Append encoded JSON Lines to HISTORY_FILE."""
+    if lines:
+        with open(HISTORY_FILE, 'ab') as f:
+            f.write(lines)
+
+
+def _migrate_history():
+    """Convert a legacy JSON-array history file to JSON Lines (one-time)."""
+    if not LEGACY_HISTORY_FILE.exists() or HISTORY_FILE.exists():
+        return
+    history = read_json(LEGACY_HISTORY_FILE, None)
+    if not isinstance(history, list):
+        return  # unreadable: leave it alone rather than lose it
+    HISTORY_FILE.write_bytes(_history_lines(history))
+    LEGACY_HISTORY_FILE.rename(LEGACY_HISTORY_FILE.with_name(LEGACY_HISTORY_FILE.name + ".migrated"))
+
+
+@dataclass(slots=True)
 class Position:
     """A delta-neutral option position."""
     id: str
@@ -29,23 +108,21 @@ class Position:
     rehedge_count: int = 0
     is_active: bool = True
     binance_symbol: Optional[str] = None  # e.g., "BTC-240227-70000-C"
+    last_delta: Optional[float] = None  # most recent delta checked against
+    # Hedge direction: short for calls, long for puts (derived, not stored)
+    _sign: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._sign = -1.0 if self.option_type == 'call' else 1.0
     
     @property
     def target_hedge(self) -> float:
         """Calculate current target hedge based on entry delta."""
-        delta_exposure = self.size * self.entry_delta
-        if self.option_type == 'call':
-            return -delta_exposure  # Short for calls
-        else:
-            return delta_exposure  # Long for puts
+        return self._sign * self.size * self.entry_delta
     
     def calculate_target_hedge(self, current_delta: float) -> float:
         """Calculate target hedge for given delta."""
-        delta_exposure = self.size * current_delta
-        if self.option_type == 'call':
-            return -delta_exposure
-        else:
-            return delta_exposure
+        return self._sign * self.size * current_delta
     
     def check_rehedge(self, current_delta: float) -> tuple[bool, float, str]:
         """
@@ -63,6 +140,13 @@ class Position:
                 action = "SELL"
             return True, abs_diff, action
         return False, 0.0, ""
+    
+    def to_dict(self) -> dict:
+        """Shallow dict of all fields, for serialization."""
+        return {name: getattr(self, name) for name in _POSITION_FIELDS}
+
+
+_POSITION_FIELDS = tuple(f.name for f in fields(Position) if f.init)
 
 
 class PositionManager:
@@ -70,81 +154,206 @@ class PositionManager:
     
     def __init__(self):
         DATA_DIR.mkdir(parents=True, exist_ok=True)
+        _migrate_history()
+        # In-memory view of POSITIONS_FILE and the mtime it was read at
+        self._active: dict[str, Position] = {}
+        self._inactive: list[dict] = []  # archived and unparseable records, written back as-is
+        self._mtime: Optional[int] = None
+        # Changes not yet written (see save=False on the mutating methods):
+        # _version counts in-memory changes, _saved_version is the last one on disk
+        self._version = 0
+        self._saved_version = 0
+        self._pending_history: list[tuple[int, Position]] = []  # (version, closed position)
     
-    def load_positions(self) -> list[Position]:
-        """Load all active positions."""
-        if not POSITIONS_FILE.exists():
-            return []
+    @property
+    def dirty(self) -> bool:
+        """Whether there are in-memory changes not yet written to disk."""
+        return self._version != self._saved_version
+    
+    def _sync(self):
+        """Re-read the positions file if it changed since the last load."""
+        if self.dirty:
+            return  # never clobber unsaved changes with the on-disk copy
         try:
-            with open(POSITIONS_FILE, 'r') as f:
-                data = json.load(f)
-            return [Position(**p) for p in data if p.get('is_active', True)]
-        except:
-            return []
-    
-    def save_positions(self, positions: list[Position]):
-        """Save positions to file."""
-        # Load existing to preserve inactive ones
-        all_positions = []
-        if POSITIONS_FILE.exists():
+            mtime = POSITIONS_FILE.stat().st_mtime_ns
+        except OSError:
+            self._active, self._inactive, self._mtime = {}, [], None
+            return
+        if mtime == self._mtime:
+            return
+        data = read_json(POSITIONS_FILE, None)
+        if not isinstance(data, list):
+            # Undecodable: set the file aside rather than overwrite it on the next save.
+            # Unique name, so a later corruption never replaces an earlier backup.
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            backup = POSITIONS_FILE.with_name(f"{POSITIONS_FILE.name}.corrupt-{stamp}")
+            n = 1
+            while backup.exists():
+                n += 1
+                backup = POSITIONS_FILE.with_name(f"{POSITIONS_FILE.name}.corrupt-{stamp}-{n}")
             try:
-                with open(POSITIONS_FILE, 'r') as f:
-                    all_positions = json.load(f)
-            except:
+                POSITIONS_FILE.replace(backup)
+            except OSError:
                 pass
-        
-        # Update active ones
-        active_ids = {p.id for p in positions}
-        for p in all_positions:
-            if p['id'] not in active_ids:
-                positions.append(Position(**p))
-        
-        with open(POSITIONS_FILE, 'w') as f:
-            json.dump([asdict(p) for p in positions], f, indent=2)
-    
-    def add_position(self, pos: Position):
-        """Add a new position."""
-        positions = self.load_positions()
-        positions.append(pos)
-        self.save_positions(positions)
-    
-    def update_position(self, pos: Position):
-        """Update an existing position."""
-        positions = self.load_positions()
-        for i, p in enumerate(positions):
-            if p.id == pos.id:
-                positions[i] = pos
-                break
-        self.save_positions(positions)
-    
-    def close_position(self, pos_id: str):
-        """Archive a position."""
-        positions = self.load_positions()
-        for p in positions:
-            if p.id == pos_id:
-                p.is_active = False
-                p.updated_at = datetime.now().isoformat()
-                self._archive_position(p)
-                break
-        self.save_positions([p for p in positions if p.id != pos_id])
-    
-    def _archive_position(self, pos: Position):
-        """Archive closed position to history."""
-        history = []
-        if HISTORY_FILE.exists():
+            self._active, self._inactive, self._mtime = {}, [], None
+            return
+        active, kept = {}, []
+        for record in data:
             try:
-                with open(HISTORY_FILE, 'r') as f:
-                    history = json.load(f)
-            except:
-                pass
-        history.append(asdict(pos))
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=2)
+                if record.get('is_active', True):
+                    pos = Position(**record)
+                    active[pos.id] = pos
+                    continue
+            except (TypeError, AttributeError):
+                pass  # not a valid Position: keep the raw record so saving preserves it
+            kept.append(record)
+        self._active, self._inactive = active, kept
+        self._mtime = mtime
+    
+    def _changed(self, save: bool):
+        self._version += 1
+        if save:
+            self.flush()
+    
+    def snapshot(self) -> tuple[int, bytes, bytes]:
+        """
+        Serialize pending changes for write_snapshot().
+        Must run on the thread that mutates positions. Changes stay pending
+        until mark_saved() is called with the returned version.
+        Returns: (version, positions file contents, history lines to append)
+        """
+        positions = dumps([*self._active.values(), *self._inactive])
+        history = _history_lines(p for _, p in self._pending_history)
+        return self._version, positions, history
     
     @staticmethod
-    def generate_id() -> str:
-        """Generate unique position ID."""
-        return datetime.now().strftime("%Y%m%d-%H%M%S")
+    def write_snapshot(positions: bytes, history: bytes) -> int:
+        """
+        Write a snapshot to disk. Touches no manager state, so safe in a worker thread.
+        Returns: the new mtime of the positions file, for mark_saved()
+        """
+        # Write-then-rename so readers never see a half-written file
+        tmp = POSITIONS_FILE.with_name(POSITIONS_FILE.name + '.tmp')
+        tmp.write_bytes(positions)
+        os.replace(tmp, POSITIONS_FILE)
+        mtime = POSITIONS_FILE.stat().st_mtime_ns
+        _append_history(history)
+        return mtime
+    
+    def mark_saved(self, version: int, mtime: int):
+        """Record that the snapshot taken at version was written successfully."""
+        self._saved_version = version
+        self._pending_history = [(v, p) for v, p in self._pending_history if v > version]
+        self._mtime = mtime
+    
+    def append_history(self, records: Iterable):
+        """Append already-closed positions (Position objects or dicts) to the history now."""
+        _append_history(_history_lines(records))
+    
+    def flush(self):
+        """Write pending changes to disk now."""
+        version, positions, history = self.snapshot()
+        self.mark_saved(version, self.write_snapshot(positions, history))
+    
+    def load_positions(self) -> list[Position]:
+        """Load all active positions."""
+        self._sync()
+        return list(self._active.values())
+    
+    def get_position(self, pos_id: str) -> Optional[Position]:
+        """Find an active position by its ID."""
+        self._sync()
+        return self._active.get(pos_id)
+    
+    def save_positions(self, positions: list[Position], save: bool = True):
+        """Save positions to file, keeping previously archived inactive ones."""
+        self._sync()
+        self._active = {p.id: p for p in positions}
+        self._changed(save)
+    
+    def add_position(self, pos: Position, save: bool = True):
+        """Add a new position. With save=False, only update memory until flush()."""
+        self._sync()
+        if pos.id in self._active:
+            raise ValueError(f"Position {pos.id} already exists")
+        self._active[pos.id] = pos
+        self._changed(save)
+    
+    def update_position(self, pos: Position, save: bool = True):
+        """Update an existing position. With save=False, only update memory until flush()."""
+        self._sync()
+        if pos.id in self._active:
+            self._active[pos.id] = pos
+        self._changed(save)
+    
+    def close_position(self, pos_id: str, save: bool = True):
+        """Archive a position. With save=False, only update memory until flush()."""
+        self._sync()
+        p = self._active.pop(pos_id, None)
+        if p is not None:
+            p.is_active = False
+            p.updated_at = now_iso()
+            self._pending_history.append((self._version + 1, p))
+        self._changed(save)
+    
+    def scan(
+        self, deltas: dict[str, float], positions: Optional[list[Position]] = None
+    ) -> dict[str, tuple[bool, float, str]]:
+        """
+        Check many positions against current deltas in one pass.
+        deltas maps position id -> current delta; positions without a delta are skipped.
+        positions defaults to the active positions; pass the exact objects being
+        displayed to check those instead of a fresh reload.
+        Returns: {position id: (needs_rehedge, amount, action)}
+        """
+        if positions is None:
+            self._sync()
+            positions = self._active.values()
+        positions = [p for p in positions if p.id in deltas]
+        # Small batches: plain Python beats importing numba and packing arrays
+        if len(positions) < SCAN_BATCH_MIN:
+            return {p.id: p.check_rehedge(deltas[p.id]) for p in positions}
+        
+        from . import positions_numba as nb
+        if not nb.HAVE_NUMBA:
+            return {p.id: p.check_rehedge(deltas[p.id]) for p in positions}
+        
+        np = nb.np
+        needs, amounts, actions = nb.check_rehedge_batch(
+            np.array([p.size for p in positions], dtype=np.float64),
+            np.array([deltas[p.id] for p in positions], dtype=np.float64),
+            np.array([p.current_hedge for p in positions], dtype=np.float64),
+            np.array([p.band for p in positions], dtype=np.float64),
+            np.array([p.option_type == 'call' for p in positions], dtype=np.int8),
+        )
+        labels = {nb.ACTION_NONE: "", nb.ACTION_BUY: "BUY", nb.ACTION_SELL: "SELL"}
+        return {
+            p.id: (bool(needs[i]), float(amounts[i]), labels[int(actions[i])])
+            for i, p in enumerate(positions)
+        }
+    
+    def load_history(self) -> Iterator[dict]:
+        """Yield archived positions one record at a time."""
+        try:
+            with open(HISTORY_FILE, 'rb') as f:
+                for line in f:
+                    try:
+                        yield _loads(line)
+                    except ValueError:
+                        continue  # blank or partially written line
+        except OSError:
+            return
+    
+    def generate_id(self) -> str:
+        """Generate a position ID no active position uses yet."""
+        self._sync()
+        base = datetime.now().strftime("%Y%m%d-%H%M%S")
+        # Timestamps only change once per second: suffix repeats within one
+        pos_id, n = base, 1
+        while pos_id in self._active:
+            n += 1
+            pos_id = f"{base}-{n}"
+        return pos_id
     
     @staticmethod
     def make_contract_name(expiry: str, strike: float, option_type: str) -> str:
@@ -155,15 +364,17 @@ class PositionManager:
     def make_binance_symbol(expiry: str, strike: float, option_type: str) -> str:
         """Generate Binance symbol like BTC-240227-70000-C."""
         # Convert 27FEB to 240227 format
-        import re
-        match = re.match(r'(\d{1,2})(\w{3})', expiry.upper())
+        match = _EXPIRY_RE.match(expiry.upper())
         if match:
             day, month = match.groups()
-            months = {'JAN': '01', 'FEB': '02', 'MAR': '03', 'APR': '04',
-                      'MAY': '05', 'JUN': '06', 'JUL': '07', 'AUG': '08',
-                      'SEP': '09', 'OCT': '10', 'NOV': '11', 'DEC': '12'}
-            month_num = months.get(month, '01')
+            month_num = _MONTHS.get(month, '01')
             year = '26'  # Assume 2026 for now
             date_str = f"{year}{month_num}{int(day):02d}"
             return f"BTC-{date_str}-{int(strike)}-{option_type[0].upper()}"
         return None
+
+
+@lru_cache(maxsize=1)
+def get_position_manager() -> PositionManager:
+    """Get the process-wide PositionManager shared by all screens."""
+    return PositionManager()
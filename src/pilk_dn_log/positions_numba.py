@@ -0,0 +1,46 @@
+"""Batched rehedge checks, JIT-compiled with Numba when available."""
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # optional dependency, callers fall back to Position.check_rehedge
+    np = None
+    njit = None
+
+HAVE_NUMBA = njit is not None
+
+# Values of the ``actions`` array returned by check_rehedge_batch
+ACTION_NONE = 0
+ACTION_BUY = 1
+ACTION_SELL = -1
+
+
+if HAVE_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _check_rehedge_batch(sizes, deltas, hedges, bands, is_call):
+        n = sizes.shape[0]
+        needs = np.zeros(n, dtype=np.bool_)
+        amounts = np.zeros(n, dtype=np.float64)
+        actions = np.zeros(n, dtype=np.int8)
+        for i in range(n):
+            target = sizes[i] * deltas[i]
+            if is_call[i]:
+                target = -target
+            diff = target - hedges[i]
+            abs_diff = abs(diff)
+            if abs_diff > bands[i]:
+                needs[i] = True
+                amounts[i] = abs_diff
+                actions[i] = ACTION_BUY if diff > 0 else ACTION_SELL
+        return needs, amounts, actions
+
+
+def check_rehedge_batch(sizes, deltas, hedges, bands, is_call):
+    """
+    Vectorized Position.check_rehedge over NumPy arrays.
+    sizes/deltas/hedges/bands are float64, is_call is int8 (1 = call, 0 = put).
+    Returns: (needs, amounts, actions) arrays
+    """
+    if not HAVE_NUMBA:
+        raise RuntimeError("numba is not installed")
+    return _check_rehedge_batch(sizes, deltas, hedges, bands, is_call)
@@ -7,19 +7,108 @@ from textual.widgets import (
     DataTable, RichLog
 )
 from textual.screen import Screen, ModalScreen
+from textual.worker import Worker
 from textual.reactive import reactive
-from textual import on
+from textual import on, work
 from rich.text import Text
 from rich.style import Style
-from datetime import datetime
 from typing import Optional
 import asyncio
+import math
+import sys
+import time
 
-from .positions import Position, PositionManager
-from .binance_api import get_binance_api
+from .positions import Position, PositionManager, get_position_manager, now_iso
 
+# Minimum seconds between two delta polls from the detail screen
+REFRESH_MIN_INTERVAL = 0.5
 
-class NewPositionModal(ModalScreen):
+# Seconds to wait after a change so bursts of edits become one disk write
+SAVE_COALESCE_DELAY = 0.1
+
+# Dashboard status cells: shared objects, so unchanged cells compare by identity
+_STATUS_REHEDGE = Text("⚠️ REHEDGE", no_wrap=True)
+_STATUS_OK = Text("✅ OK", no_wrap=True)
+
+
+def _state_key(pos: Position) -> tuple:
+    """Cheap fingerprint of the fields that change while a position is open."""
+    # updated_at alone has second precision, so two edits can share it
+    return (pos.updated_at, pos.current_hedge, pos.rehedge_count)
+
+
+def _position_cells(pos: Position) -> tuple[Text, ...]:
+    """Table cells for a position, minus the status column."""
+    # All dashboard cell formatting lives here, in one place.
+    # Pre-built Text cells skip DataTable's str -> Text conversion on render.
+    return (
+        Text(pos.name, no_wrap=True),
+        Text(pos.option_type.upper(), no_wrap=True),
+        Text(f"${pos.strike:,}", no_wrap=True, justify="right"),
+        Text(f"{pos.size}", no_wrap=True, justify="right"),
+        Text(f"{pos.current_hedge:+.4f}", no_wrap=True, justify="right"),
+        Text(f"{pos.entry_delta:.3f}", no_wrap=True, justify="right"),
+        Text(f"{pos.band:.4f}", no_wrap=True, justify="right"),
+    )
+
+
+# NewPositionModal number inputs: (input id, label used in error messages, must be > 0)
+_NUMBER_FIELDS = (
+    ("strike", "Strike", True),
+    ("size", "Size", True),
+    ("entry_delta", "Entry Delta", False),
+    ("band", "Band", False),
+)
+
+
+def _parse_inputs(values: dict[str, str]) -> tuple[str, float, float, float, float]:
+    """
+    Parse the new-position form in one pass.
+    Returns: (expiry, strike, size, entry_delta, band)
+    Raises ValueError naming the first missing or invalid field.
+    """
+    expiry = values["expiry"].strip().upper()
+    if not expiry:
+        raise ValueError("Expiry is required")
+    numbers = []
+    for name, label, positive in _NUMBER_FIELDS:
+        try:
+            number = float(values[name])
+        except ValueError:
+            number = math.nan
+        if not math.isfinite(number):  # float() also accepts inf/nan/1e400
+            raise ValueError(f"{label} must be a number")
+        if positive and number <= 0:
+            raise ValueError(f"{label} must be greater than 0")
+        numbers.append(number)
+    return (expiry, *numbers)
+
+
+def _get_api():
+    """Get the shared Binance API client, importing ccxt only on first use."""
+    from .binance_api import get_binance_api
+    return get_binance_api(mock=True)  # Use mock for now
+
+
+class LabelCacheMixin:
+    """Screen mixin for Label updates that skip re-rendering unchanged content."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._label_cache: dict[str, tuple] = {}  # label id -> (content, classes)
+    
+    def _set_label(self, label: Label, content, classes: Optional[str] = None):
+        """Update a Label, skipping the re-render if content and classes are unchanged."""
+        state = (content, classes)
+        if self._label_cache.get(label.id) == state:
+            return
+        self._label_cache[label.id] = state
+        if classes is not None:
+            label.set_classes(classes)
+        label.update(content)
+
+
+class NewPositionModal(LabelCacheMixin, ModalScreen):
     """Modal for adding a new position."""
     
     CSS = """
@@ -112,22 +201,25 @@ class NewPositionModal(ModalScreen):
                 yield Button("✓ Add", variant="success", id="add")
                 yield Button("✗ Cancel", variant="error", id="cancel")
     
+    def on_mount(self):
+        self._inputs = {
+            name: self.query_one(f"#{name}", Input)
+            for name in ("expiry", "strike", "size", "entry_delta", "band")
+        }
+        self._opt_type = self.query_one("#opt_type", Select)
+        self._error_lbl = self.query_one("#error", Label)
+    
     @on(Button.Pressed, "#add")
     def on_add(self):
         try:
-            expiry = self.query_one("#expiry", Input).value.strip().upper()
-            opt_type = self.query_one("#opt_type", Select).value
-            strike = float(self.query_one("#strike", Input).value)
-            size = float(self.query_one("#size", Input).value)
-            entry_delta = float(self.query_one("#entry_delta", Input).value)
-            band = float(self.query_one("#band", Input).value)
-            
-            if not expiry or not strike or not size:
-                raise ValueError("Missing fields")
+            expiry, strike, size, entry_delta, band = _parse_inputs(
+                {name: inp.value for name, inp in self._inputs.items()}
+            )
+            opt_type = self._opt_type.value
             
             # Create position
-            manager = PositionManager()
-            pos_id = PositionManager.generate_id()
+            manager = get_position_manager()
+            pos_id = manager.generate_id()
             name = PositionManager.make_contract_name(expiry, strike, opt_type)
             binance_symbol = PositionManager.make_binance_symbol(expiry, strike, opt_type)
             
@@ -138,7 +230,7 @@ class NewPositionModal(ModalScreen):
             else:
                 initial_hedge = delta_exposure
             
-            now = datetime.now().isoformat()
+            now = now_iso()
             pos = Position(
                 id=pos_id,
                 name=name,
@@ -154,18 +246,19 @@ class NewPositionModal(ModalScreen):
                 binance_symbol=binance_symbol
             )
             
-            manager.add_position(pos)
+            manager.add_position(pos, save=False)
+            self.app.request_save()
             self.dismiss(pos)
             
         except ValueError as e:
-            self.query_one("#error", Label).update(f"❌ Invalid input: {e}")
+            self._set_label(self._error_lbl, f"❌ Invalid input: {e}")
     
     @on(Button.Pressed, "#cancel")
     def on_cancel(self):
         self.dismiss(None)
 
 
-class PositionDetailScreen(Screen):
+class PositionDetailScreen(LabelCacheMixin, Screen):
     """Detailed view of a single position."""
     
     CSS = """
@@ -211,8 +304,11 @@ class PositionDetailScreen(Screen):
     def __init__(self, position: Position):
         super().__init__()
         self.position = position
-        self.manager = PositionManager()
-        self.api = get_binance_api(mock=True)  # Use mock for now
+        self.manager = get_position_manager()
+        self.api = _get_api()
+        self._displayed_state: Optional[tuple] = None  # _state_key last rendered
+        self._last_refresh_ts = 0.0
+        self._poll_worker: Optional[Worker] = None
     
     def compose(self) -> ComposeResult:
         yield Header()
@@ -229,6 +325,9 @@ class PositionDetailScreen(Screen):
         yield Footer()
     
     def on_mount(self):
+        self._title_lbl = self.query_one("#title", Label)
+        self._stats_lbl = self.query_one("#stats", Label)
+        self._status_lbl = self.query_one("#status", Label)
         self._update_display()
     
     def _update_display(self):
@@ -236,47 +335,71 @@ class PositionDetailScreen(Screen):
             return
         
         pos = self.position
-        self.query_one("#title", Label).update(
-            f"📊 {pos.name} ({pos.option_type.upper()})"
+        state = _state_key(pos)
+        if state == self._displayed_state:
+            return  # nothing changed since the last render
+        self._displayed_state = state
+        
+        # Plain Text, so Label.update() doesn't have to parse markup
+        self._set_label(
+            self._title_lbl,
+            Text(f"📊 {pos.name} ({pos.option_type.upper()})")
         )
         
-        stats = f"""Strike: ${pos.strike:,} | Size: {pos.size} BTC
-Entry Delta: {pos.entry_delta:.4f} | Band: {pos.band:.5f}
-Current Hedge: {pos.current_hedge:+.5f} BTC
-Rehedges: {pos.rehedge_count}
-Binance: {pos.binance_symbol or 'N/A'}"""
+        stats = Text.assemble(
+            "Strike: ", f"${pos.strike:,}", " | Size: ", f"{pos.size}", " BTC\n",
+            "Entry Delta: ", f"{pos.entry_delta:.4f}", " | Band: ", f"{pos.band:.5f}", "\n",
+            "Current Hedge: ", f"{pos.current_hedge:+.5f}", " BTC\n",
+            "Rehedges: ", f"{pos.rehedge_count}", "\n",
+            "Binance: ", pos.binance_symbol or 'N/A',
+        )
         
-        self.query_one("#stats", Label).update(stats)
+        self._set_label(self._stats_lbl, stats)
     
     @on(Button.Pressed, "#refresh")
-    async def on_refresh(self):
-        """Fetch live delta from Binance."""
+    def on_refresh(self):
+        """Fetch live delta from Binance, ignoring clicks while a fetch is in flight."""
+        if self._poll_worker is not None and not self._poll_worker.is_finished:
+            return
+        now = time.monotonic()
+        if now - self._last_refresh_ts < REFRESH_MIN_INTERVAL:
+            return
+        self._last_refresh_ts = now
+        self._poll_worker = self._poll_delta()
+    
+    # A worker, so leaving the screen cancels a fetch still in flight
+    @work(exclusive=True, group="delta", exit_on_error=False)
+    async def _poll_delta(self):
         if not self.position or not self.position.binance_symbol:
-            self.query_one("#status", Label).update("❌ No Binance symbol configured")
+            self._set_label(self._status_lbl, "❌ No Binance symbol configured")
             return
         
-        self.query_one("#status", Label).update("⏳ Fetching delta...")
+        self._set_label(self._status_lbl, "⏳ Fetching delta...")
         
         try:
             delta = await self.api.get_option_delta(self.position.binance_symbol)
+            if not self.is_mounted:
+                return  # screen was dismissed while the fetch was in flight
             if delta is not None:
                 needs_rehedge, amount, action = self.position.check_rehedge(delta)
                 
                 if needs_rehedge:
-                    self.query_one("#status", Label).update(
+                    self._set_label(
+                        self._status_lbl,
                         f"🚨 REHEDGE NEEDED\n"
                         f"Current Δ: {delta:.4f} | {action} {amount:.4f} BTC",
                         classes="alert"
                     )
                 else:
-                    self.query_one("#status", Label).update(
+                    self._set_label(
+                        self._status_lbl,
                         f"✅ SAFE\nCurrent Δ: {delta:.4f}",
                         classes="safe"
                     )
             else:
-                self.query_one("#status", Label).update("❌ Could not fetch delta")
+                self._set_label(self._status_lbl, "❌ Could not fetch delta")
         except Exception as e:
-            self.query_one("#status", Label).update(f"❌ Error: {e}")
+            self._set_label(self._status_lbl, f"❌ Error: {e}")
     
     @on(Button.Pressed, "#manual")
     def on_manual(self):
@@ -290,7 +413,8 @@ Binance: {pos.binance_symbol or 'N/A'}"""
             needs_rehedge, amount, action = self.position.check_rehedge(delta)
             
             if needs_rehedge:
-                self.query_one("#status", Label).update(
+                self._set_label(
+                    self._status_lbl,
                     f"🚨 REHEDGE: {action} {amount:.4f} BTC",
                     classes="alert"
                 )
@@ -300,21 +424,24 @@ Binance: {pos.binance_symbol or 'N/A'}"""
                 diff = target - self.position.current_hedge
                 self.position.current_hedge = target
                 self.position.rehedge_count += 1
-                self.position.updated_at = datetime.now().isoformat()
-                self.manager.update_position(self.position)
+                self.position.updated_at = now_iso()
+                self.manager.update_position(self.position, save=False)
+                self.app.request_save()
                 self._update_display()
             else:
-                self.query_one("#status", Label).update(
+                self._set_label(
+                    self._status_lbl,
                     f"✅ SAFE (Δ={delta:.4f})",
                     classes="safe"
                 )
-        except ValueError:
-            pass
+        except (TypeError, ValueError):
+            pass  # cancelled (None) or not a number
     
     @on(Button.Pressed, "#close")
     def on_close(self):
         """Close and archive this position."""
-        self.manager.close_position(self.position.id)
+        self.manager.close_position(self.position.id, save=False)
+        self.app.request_save()
         self.app.pop_screen()
     
     @on(Button.Pressed, "#back")
@@ -343,7 +470,7 @@ class ManualDeltaModal(ModalScreen):
         self.dismiss(None)
 
 
-class MainScreen(Screen):
+class MainScreen(LabelCacheMixin, Screen):
     """Main dashboard showing all positions."""
     
     CSS = """
@@ -378,13 +505,18 @@ class MainScreen(Screen):
     
     def __init__(self):
         super().__init__()
-        self.manager = PositionManager()
+        self.manager = get_position_manager()
+        # Cells currently shown for each row, keyed by position id (= row key),
+        # with the (_state_key, live delta) they were formatted for
+        self._rows: dict[str, tuple[tuple, tuple[Text, ...]]] = {}
+        # Live deltas from the last refresh, keyed by position id
+        self._deltas: dict[str, float] = {}
     
     def compose(self) -> ComposeResult:
         yield Header()
         with Container():
             yield Label("🌸 PILK DELTA-NEUTRAL LOGGER", classes="title")
-            yield DataTable(id="positions_table")
+            yield DataTable(id="positions_table", cursor_type="row")
             yield Label("", id="empty", classes="empty")
             with Horizontal(classes="actions"):
                 yield Button("➕ New Position", variant="success", id="new")
@@ -392,39 +524,72 @@ class MainScreen(Screen):
         yield Footer()
     
     def on_mount(self):
+        self._table = self.query_one("#positions_table", DataTable)
+        self._empty_label = self.query_one("#empty", Label)
+        self._columns = self._table.add_columns(
+            "Contract", "Type", "Strike", "Size", "Hedge", "Δ", "Band", "Status"
+        )
+        self._load_positions()
+    
+    def on_screen_resume(self):
+        # Pick up edits/closes made on the detail screen
         self._load_positions()
-        table = self.query_one("#positions_table", DataTable)
-        table.add_columns("Contract", "Type", "Strike", "Size", "Hedge", "Δ", "Band", "Status")
     
     def _load_positions(self):
         self.positions = self.manager.load_positions()
         self._update_table()
     
+    @staticmethod
+    def _format_row(pos: Position, needs_rehedge: bool) -> tuple[Text, ...]:
+        status = _STATUS_REHEDGE if needs_rehedge else _STATUS_OK
+        return _position_cells(pos) + (status,)
+    
     def _update_table(self):
-        table = self.query_one("#positions_table", DataTable)
-        table.clear()
+        """Apply only the row/cell changes since the last update."""
+        table = self._table
+        rows = {}
+        stale = {}  # position id -> (position, stamp) for rows to re-format
+        for pos in self.positions:
+            stamp = (_state_key(pos), self._deltas.get(pos.id))
+            cached = self._rows.get(pos.id)
+            if cached and cached[0] == stamp:
+                rows[pos.id] = cached  # unchanged since last format
+            else:
+                stale[pos.id] = (pos, stamp)
         
-        if not self.positions:
-            self.query_one("#empty", Label).update("No active positions. Press '➕ New Position' to add one.")
-            return
+        if stale:
+            # Status from the live delta if we have one, in one batched check
+            checks = self.manager.scan(
+                {
+                    pos_id: pos.entry_delta if stamp[1] is None else stamp[1]
+                    for pos_id, (pos, stamp) in stale.items()
+                },
+                [pos for pos, _ in stale.values()],
+            )
+            for pos_id, (pos, stamp) in stale.items():
+                rows[pos_id] = (stamp, self._format_row(pos, checks[pos_id][0]))
         
-        self.query_one("#empty", Label).update("")
+        # Keep the positions' order
+        rows = {pos.id: rows[pos.id] for pos in self.positions}
         
-        for pos in self.positions:
-            # Determine status indicator
-            needs_rehedge, _, _ = pos.check_rehedge(pos.entry_delta)
-            status = "⚠️ REHEDGE" if needs_rehedge else "✅ OK"
-            
-            table.add_row(
-                pos.name,
-                pos.option_type.upper(),
-                f"${pos.strike:,}",
-                f"{pos.size}",
-                f"{pos.current_hedge:+.4f}",
-                f"{pos.entry_delta:.3f}",
-                f"{pos.band:.4f}",
-                status
-            )
+        for pos_id in self._rows.keys() - rows.keys():
+            table.remove_row(pos_id)
+        
+        for pos_id, (_, cells) in rows.items():
+            old = self._rows.get(pos_id)
+            if old is None:
+                table.add_row(*cells, key=pos_id)
+            elif old[1] is not cells:
+                for column, old_cell, cell in zip(self._columns, old[1], cells):
+                    if old_cell != cell:
+                        table.update_cell(pos_id, column, cell)
+        
+        self._rows = rows
+        
+        if not self.positions:
+            self._set_label(self._empty_label, "No active positions. Press '➕ New Position' to add one.")
+        else:
+            self._set_label(self._empty_label, "")
     
     @on(Button.Pressed, "#new")
     def on_new(self):
@@ -436,11 +601,29 @@ class MainScreen(Screen):
     @on(Button.Pressed, "#refresh")
     def on_refresh(self):
         self._load_positions()
+        self._refresh_all_deltas()
+    
+    # Worker, so the fetch doesn't block the message queue (and a new refresh replaces it)
+    @work(exclusive=True, group="refresh_all", exit_on_error=False)
+    async def _refresh_all_deltas(self):
+        """Fetch live deltas for every position concurrently."""
+        symbols = {p.binance_symbol for p in self.positions if p.binance_symbol}
+        if not symbols:
+            return
+        by_symbol = await _get_api().fetch_deltas(list(symbols))
+        if not self.is_mounted:
+            return
+        self._deltas = {
+            p.id: by_symbol[p.binance_symbol]
+            for p in self.positions
+            if by_symbol.get(p.binance_symbol) is not None
+        }
+        self._update_table()
     
     @on(DataTable.RowSelected, "#positions_table")
     def on_row_selected(self, event: DataTable.RowSelected):
-        if event.row_index < len(self.positions):
-            pos = self.positions[event.row_index]
+        pos = self.manager.get_position(event.row_key.value)
+        if pos:
             self.app.push_screen(PositionDetailScreen(pos))
 
 
@@ -465,13 +648,56 @@ class DnLogApp(App):
     ]
     
     def on_mount(self):
+        self._save_requested = asyncio.Event()
+        self._closing = False
+        self._writer = asyncio.create_task(self._writer_loop())
         self.push_screen("main")
     
+    def request_save(self):
+        """Schedule a background write of position changes."""
+        self._save_requested.set()
+    
+    async def _writer_loop(self):
+        """Persist position changes off the event loop, coalescing bursts."""
+        manager = get_position_manager()
+        while not self._closing:
+            await self._save_requested.wait()
+            if not self._closing:
+                await asyncio.sleep(SAVE_COALESCE_DELAY)
+            self._save_requested.clear()
+            if not manager.dirty:
+                continue
+            version, positions, history = manager.snapshot()
+            try:
+                mtime = await asyncio.to_thread(manager.write_snapshot, positions, history)
+            except OSError as e:
+                # Changes stay pending, so the next save (or quitting) retries them
+                self.notify(f"❌ Could not save positions: {e}", severity="error")
+                continue
+            manager.mark_saved(version, mtime)
+    
+    async def on_unmount(self):
+        # Let the writer finish any pending save before exiting
+        self._closing = True
+        self._save_requested.set()
+        await self._writer
+        # Changes made while the last write was in flight
+        manager = get_position_manager()
+        if manager.dirty:
+            manager.flush()
+        
+        # Nothing to close if no screen ever needed the API
+        binance_api = sys.modules.get(f"{__package__}.binance_api")
+        if binance_api is not None:
+            await binance_api.close_binance_apis()
+    
     def action_new_position(self):
-        self.query_one(MainScreen).on_new()
+        if isinstance(self.screen, MainScreen):
+            self.screen.on_new()
     
     def action_refresh(self):
-        self.query_one(MainScreen).on_refresh()
+        if isinstance(self.screen, MainScreen):
+            self.screen.on_refresh()
 
 
 def main():